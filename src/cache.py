@@ -0,0 +1,138 @@
+"""A small on-disk TTL cache for third-party API responses.
+
+Entries keep the ``ETag``/``Last-Modified`` validators of the response they
+came from so that stale entries can be revalidated with a conditional GET.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Hashable, List, Mapping, Optional
+
+
+def cache_dir() -> str:
+    """Return the cache directory.
+
+    ``DAILY_SUMMARY_CACHE_DIR`` overrides the default of
+    ``~/.cache/daily-summary``.
+    """
+    return os.getenv("DAILY_SUMMARY_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "daily-summary"
+    )
+
+
+def load(key: Hashable) -> Optional[Dict[str, Any]]:
+    """Return the cache entry for ``key``, fresh or stale, or ``None``.
+
+    An entry is a dict with ``payload``, ``etag``, ``last_modified`` and
+    ``expires`` (a Unix timestamp) keys.
+    """
+    try:
+        with open(_path(key), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(entry: Optional[Dict[str, Any]]) -> bool:
+    """Return ``True`` if ``entry`` exists and has not expired."""
+    return entry is not None and entry.get("expires", 0) > time.time()
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Return the request headers needed to revalidate a stale ``entry``."""
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def store(key: Hashable, payload: Any, headers: Mapping[str, str], default_ttl: float) -> None:
+    """Cache ``payload`` along with the validators from the response ``headers``.
+
+    Parameters
+    ----------
+    key:
+        Cache key; any value with a stable ``repr``.
+    payload:
+        JSON-serialisable value to cache.
+    headers:
+        Response headers. Lookups must be case-insensitive, as they are for
+        both ``requests`` and ``aiohttp`` responses.
+    default_ttl:
+        Lifetime in seconds when ``Cache-Control`` does not specify one.
+    """
+    _write(key, payload, headers, default_ttl, None)
+
+
+def refresh(
+    key: Hashable, entry: Dict[str, Any], headers: Mapping[str, str], default_ttl: float
+) -> Any:
+    """Extend a stale ``entry`` after a ``304 Not Modified`` and return its payload."""
+    _write(key, entry["payload"], headers, default_ttl, entry)
+    return entry["payload"]
+
+
+def _write(
+    key: Hashable,
+    payload: Any,
+    headers: Mapping[str, str],
+    default_ttl: float,
+    previous: Optional[Dict[str, Any]],
+) -> None:
+    # Failures to write are ignored: the cache is an optimisation and must
+    # never break a caller.
+    directives = [d.strip().lower() for d in headers.get("Cache-Control", "").split(",")]
+    if "no-store" in directives:
+        return
+
+    previous = previous or {}
+    entry = {
+        "payload": payload,
+        "etag": headers.get("ETag") or previous.get("etag"),
+        "last_modified": headers.get("Last-Modified") or previous.get("last_modified"),
+        "expires": time.time() + _max_age(directives, default_ttl),
+    }
+    if entry["expires"] <= time.time() and not (entry["etag"] or entry["last_modified"]):
+        # Already stale and cannot be revalidated, so it would never be used.
+        return
+
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp_path, _path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def _max_age(directives: List[str], default: float) -> float:
+    """Return the freshness lifetime from parsed ``Cache-Control`` directives."""
+    if "no-cache" in directives:
+        return 0
+    for directive in directives:
+        name, _, value = directive.partition("=")
+        if name == "max-age":
+            try:
+                return float(value.strip('"'))
+            except ValueError:
+                break
+    return default
+
+
+def _path(key: Hashable) -> str:
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir(), f"{digest}.json")
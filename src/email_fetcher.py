@@ -1,7 +1,39 @@
+import asyncio
+import base64
+import binascii
 import imaplib
-import email
-from email.header import decode_header
-from typing import List, Tuple
+import email.message
+import email.policy
+import quopri
+import re
+import threading
+from email.header import decode_header, make_header
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bytes of the plain-text part fetched per message; plenty for a snippet.
+_SNIPPET_BYTES = 4096
+
+# Logged-in sessions keyed by ``(host, username)`` so repeated polls skip the
+# TLS handshake and LOGIN.
+_POOL: Dict[Tuple[str, str], imaplib.IMAP4_SSL] = {}
+# One lock per pool key, held for a whole exchange: an IMAP connection cannot
+# interleave commands, and fetch_unread_async calls in from worker threads.
+_LOCKS: Dict[Tuple[str, str], threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+# Upper bound on the sequence set sent in one command. Servers limit command
+# lines to around 8 KB, so larger sets are split across several commands.
+_MAX_SET_BYTES = 4000
+
+_MESSAGE_NUMBER = re.compile(rb"^\d+ \(")
+# Parentheses, quoted strings and atoms. ``BODY[...]<n>`` is a single atom even
+# though the brackets may contain spaces and parentheses; a trailing literal
+# marker ``{n}`` is skipped as its data arrives separately.
+_TOKEN = re.compile(
+    rb'\s*(?:([()])|"((?:[^"\\]|\\.)*)"|\{\d+\}$|([^\s()"\[]*(?:\[[^\]]*\][^\s()]*)?))'
+)
+_QUOTED_ESCAPE = re.compile(rb"\\(.)")
+_WHITESPACE = re.compile(r"\s+")
 
 
 def fetch_unread(
@@ -11,9 +43,13 @@ def fetch_unread(
     *,
     mailbox: str = "INBOX",
     mark_as_read: bool = False,
+    snippets: bool = True,
 ) -> List[Tuple[str, str]]:
     """Fetch unread email messages from an IMAP server.
 
+    The logged-in session is kept in a pool keyed by ``(host, username)`` and
+    reused by later calls; use :func:`close_all` to log out at shutdown.
+
     Parameters
     ----------
     host:
@@ -26,6 +62,9 @@ def fetch_unread(
         Mailbox to check. Defaults to ``"INBOX"``.
     mark_as_read:
         If ``True`` the messages will be marked as read after fetching.
+    snippets:
+        If ``False`` only subjects are fetched and every snippet is ``""``,
+        saving the body round-trips.
 
     Returns
     -------
@@ -33,59 +72,424 @@ def fetch_unread(
         A list of ``(subject, snippet)`` pairs for each unread message.
     """
 
+    key = (host, username)
+    with _lock(key):
+        connection = _get_conn(host, username, password)
+        try:
+            return _fetch_messages(
+                connection, mailbox=mailbox, mark_as_read=mark_as_read, snippets=snippets
+            )
+        except imaplib.IMAP4.abort:
+            # The pooled session is unusable; the next call will reconnect.
+            _evict(key)
+            raise
+
+
+async def fetch_unread_async(
+    host: str,
+    username: str,
+    password: str,
+    *,
+    mailbox: str = "INBOX",
+    mark_as_read: bool = False,
+    snippets: bool = True,
+) -> List[Tuple[str, str]]:
+    """Asynchronous variant of :func:`fetch_unread`.
+
+    The blocking IMAP exchange runs in a worker thread so it can overlap with
+    other I/O on the event loop; the pooled session is shared with
+    :func:`fetch_unread`.
+    """
+    return await asyncio.to_thread(
+        fetch_unread,
+        host,
+        username,
+        password,
+        mailbox=mailbox,
+        mark_as_read=mark_as_read,
+        snippets=snippets,
+    )
+
+
+def close_all() -> None:
+    """Log out of every pooled IMAP connection.
+
+    Long-running callers should invoke this at shutdown.
+    """
+    for key in list(_POOL):
+        with _lock(key):
+            _evict(key)
+
+
+def _lock(key: Tuple[str, str]) -> threading.Lock:
+    """Return the lock guarding the pooled connection for ``key``."""
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(key, threading.Lock())
+
+
+def _get_conn(host: str, username: str, password: str) -> imaplib.IMAP4_SSL:
+    """Return a logged-in connection, reusing the pooled one if still alive.
+
+    The caller must hold ``_lock((host, username))``.
+    """
+    key = (host, username)
+    connection = _POOL.get(key)
+    if connection is not None:
+        try:
+            connection.noop()
+            return connection
+        except (imaplib.IMAP4.error, OSError):
+            _evict(key)
+
     connection = imaplib.IMAP4_SSL(host)
     try:
         connection.login(username, password)
-        connection.select(mailbox)
+    except Exception:
+        connection.shutdown()
+        raise
+    _POOL[key] = connection
+    return connection
+
+
+def _evict(key: Tuple[str, str]) -> None:
+    """Drop a connection from the pool, logging out on a best-effort basis."""
+    connection = _POOL.pop(key, None)
+    if connection is None:
+        return
+    try:
+        connection.logout()
+    except (imaplib.IMAP4.error, OSError):
+        pass
+
+
+def _fetch_messages(
+    connection: imaplib.IMAP4, *, mailbox: str, mark_as_read: bool, snippets: bool
+) -> List[Tuple[str, str]]:
+    """Return ``(subject, snippet)`` pairs for unread messages in ``mailbox``."""
+    connection.select(mailbox)
 
-        status, data = connection.search(None, "UNSEEN")
+    status, data = connection.search(None, "UNSEEN")
+    if status != "OK":
+        return []
+
+    nums = data[0].split()
+    if not nums:
+        return []
+
+    # Fetch the subject, plus the MIME structure if snippets are wanted, of
+    # every unread message in a single round-trip (or a few, for very large
+    # sets). ``BODY.PEEK`` leaves the ``\Seen`` flag untouched so
+    # ``mark_as_read`` is honoured.
+    message_parts = "BODY.PEEK[HEADER.FIELDS (SUBJECT)]"
+    if snippets:
+        message_parts += " BODYSTRUCTURE"
+    responses = _fetch_items(connection, nums, f"({message_parts})")
+    if responses is None:
+        return []
+
+    subjects: Dict[bytes, str] = {}
+    structures: Dict[bytes, Any] = {}
+    for num in nums:
+        items = responses.get(num)
+        if items is None:
+            continue
+        subjects[num] = _decode_subject(email.message_from_bytes(items.get("HEADER") or b""))
+        structures[num] = items.get("BODYSTRUCTURE")
+
+    texts = _fetch_snippets(connection, structures) if snippets else {}
+
+    messages: List[Tuple[str, str]] = [
+        (subjects[num], texts.get(num, "")) for num in nums if num in subjects
+    ]
+
+    if mark_as_read:
+        for message_set in _message_sets(nums):
+            connection.store(message_set, "+FLAGS", "\\Seen")
+
+    return messages
+
+
+def _fetch_snippets(connection: imaplib.IMAP4, structures: Dict[bytes, Any]) -> Dict[bytes, str]:
+    """Return a snippet for each message, given its ``BODYSTRUCTURE``.
+
+    Only the first few KB of each message's plain-text part are fetched.
+    Messages whose structure is missing or unexpected are fetched in full and
+    parsed locally instead.
+    """
+    snippets: Dict[bytes, str] = {}
+    by_section: Dict[str, List[bytes]] = {}
+    encodings: Dict[bytes, Tuple[str, str]] = {}
+    fallback: List[bytes] = []
+    for num, structure in structures.items():
+        try:
+            part = _find_text_part(structure)
+        except (IndexError, TypeError, AttributeError):
+            fallback.append(num)
+            continue
+        if part is None:
+            snippets[num] = ""
+            continue
+        section, charset, encoding = part
+        by_section.setdefault(section, []).append(num)
+        encodings[num] = (charset, encoding)
+
+    # Messages sharing a section number (usually "1" or "1.1") share a
+    # round-trip.
+    for section, nums in by_section.items():
+        responses = _fetch_items(
+            connection, nums, f"(BODY.PEEK[{section}]<0.{_SNIPPET_BYTES}>)"
+        ) or {}
+        for num in nums:
+            body = responses.get(num, {}).get(section) or b""
+            snippets[num] = _make_snippet(_decode_body(body, *encodings[num]))
+
+    if fallback:
+        responses = _fetch_items(connection, fallback, "(BODY.PEEK[])") or {}
+        for num in fallback:
+            raw = responses.get(num, {}).get("") or b""
+            msg = email.message_from_bytes(raw, policy=email.policy.default)
+            snippets[num] = _extract_snippet(msg)
+
+    return snippets
+
+
+def _fetch_items(
+    connection: imaplib.IMAP4, nums: List[bytes], message_parts: str
+) -> Optional[Dict[bytes, Dict[str, Any]]]:
+    """FETCH ``message_parts`` of the messages ``nums`` and parse the responses.
+
+    The result maps each message number to its data items. ``BODY[...]``
+    items are keyed by their section (``"HEADER"`` for any ``HEADER.FIELDS``
+    request, ``""`` for the whole message); other items by their upper-cased
+    name. ``None`` is returned if a FETCH fails.
+    """
+    result: Dict[bytes, Dict[str, Any]] = {}
+    for message_set in _message_sets(nums):
+        status, msg_data = connection.fetch(message_set, message_parts)
         if status != "OK":
-            return []
+            return None
+        result.update(_parse_fetch(msg_data))
+    return result
 
-        messages: List[Tuple[str, str]] = []
-        for num in data[0].split():
-            status, msg_data = connection.fetch(num, "(RFC822)")
-            if status != "OK":
-                continue
 
-            msg = email.message_from_bytes(msg_data[0][1])
+def _message_sets(nums: List[bytes]) -> Iterator[bytes]:
+    """Yield sequence sets that together cover the message numbers ``nums``.
 
-            # Decode the subject if needed
-            subject, encoding = decode_header(msg.get("Subject", ""))[0]
-            if isinstance(subject, bytes):
-                subject = subject.decode(encoding or "utf-8", errors="replace")
+    Runs of consecutive numbers are collapsed into ``first:last`` ranges and
+    each set is kept under ``_MAX_SET_BYTES``.
+    """
+    ranges: List[List[int]] = []
+    for num in sorted({int(num) for num in nums}):
+        if ranges and num == ranges[-1][1] + 1:
+            ranges[-1][1] = num
+        else:
+            ranges.append([num, num])
+
+    parts: List[bytes] = []
+    size = 0
+    for first, last in ranges:
+        part = b"%d" % first if first == last else b"%d:%d" % (first, last)
+        if parts and size + len(part) > _MAX_SET_BYTES:
+            yield b",".join(parts)
+            parts, size = [], 0
+        parts.append(part)
+        size += len(part) + 1
+    if parts:
+        yield b",".join(parts)
 
-            snippet = _extract_snippet(msg)
-            messages.append((subject, snippet))
 
-            if mark_as_read:
-                connection.store(num, "+FLAGS", "\\Seen")
+def _parse_fetch(msg_data: List[Any]) -> Dict[bytes, Dict[str, Any]]:
+    """Parse the data returned by ``imaplib.IMAP4.fetch``, keyed as above."""
+    # imaplib returns each literal as a ``(text, literal)`` tuple and the text
+    # that follows it as plain bytes. A new response starts with "<num> (".
+    responses: List[List[bytes]] = []
+    for item in msg_data:
+        text = item[0] if isinstance(item, tuple) else item
+        if not isinstance(text, bytes):
+            continue
+        if _MESSAGE_NUMBER.match(text) or not responses:
+            responses.append([])
+        responses[-1].append(text)
+        if isinstance(item, tuple):
+            responses[-1].append(_Literal(item[1]))
 
-        return messages
-    finally:
+    result: Dict[bytes, Dict[str, Any]] = {}
+    for segments in responses:
         try:
-            connection.close()
-        finally:
-            connection.logout()
-
-
-def _extract_snippet(msg: email.message.Message) -> str:
-    """Return a short text snippet from an email message."""
-    text = ""
-    if msg.is_multipart():
-        for part in msg.walk():
-            if part.get_content_type() == "text/plain" and not part.get("Content-Disposition"):
-                payload = part.get_payload(decode=True)
-                charset = part.get_content_charset() or "utf-8"
-                text = payload.decode(charset, errors="replace")
+            num, values = _parse_response(segments)
+        except (ValueError, IndexError):
+            continue
+        items: Dict[str, Any] = {}
+        for name, value in zip(values[::2], values[1::2]):
+            key = name.decode("ascii", errors="replace").upper()
+            if key.startswith("BODY["):
+                key = key[5:key.index("]")]
+                if key.startswith("HEADER"):
+                    key = "HEADER"
+            items[key] = value
+        # A server may split a message's data over several responses, or send
+        # an unsolicited FLAGS update for it, so merge rather than replace.
+        result.setdefault(num, {}).update(items)
+    return result
+
+
+class _Literal(bytes):
+    """Literal data from an IMAP response, as opposed to response text."""
+
+
+def _parse_response(segments: List[bytes]) -> Tuple[bytes, List[Any]]:
+    """Parse one ``<num> (<items>)`` FETCH response into its number and items.
+
+    Atoms and strings become ``bytes``, ``NIL`` becomes ``None`` and
+    parenthesised lists become Python lists.
+    """
+    tokens = _tokenize(segments)
+    num = tokens.pop(0)
+    if not isinstance(num, bytes) or not num.isdigit() or tokens.pop(0) != "(":
+        raise ValueError("not a FETCH response")
+    values, _ = _parse_list(tokens, 0)
+    return num, values
+
+
+def _tokenize(segments: List[bytes]) -> List[Any]:
+    """Split response text into ``"("``, ``")"``, ``None`` and ``bytes`` tokens."""
+    tokens: List[Any] = []
+    for segment in segments:
+        if isinstance(segment, _Literal):
+            tokens.append(bytes(segment))
+            continue
+        for match in _TOKEN.finditer(segment):
+            paren, quoted, atom = match.groups()
+            if paren:
+                tokens.append(paren.decode())
+            elif quoted is not None:
+                tokens.append(_QUOTED_ESCAPE.sub(rb"\1", quoted))
+            elif not atom:
+                continue  # literal marker or trailing whitespace
+            elif atom.upper() == b"NIL":
+                tokens.append(None)
+            else:
+                tokens.append(atom)
+    return tokens
+
+
+def _parse_list(tokens: List[Any], pos: int) -> Tuple[List[Any], int]:
+    """Parse tokens from ``pos`` up to the matching ``")"``."""
+    values: List[Any] = []
+    while True:
+        token = tokens[pos]
+        pos += 1
+        if token == ")":
+            return values, pos
+        if token == "(":
+            value, pos = _parse_list(tokens, pos)
+            values.append(value)
+        else:
+            values.append(token)
+
+
+def _find_text_part(structure: List[Any], section: str = "") -> Optional[Tuple[str, str, str]]:
+    """Locate the first plain-text body in a ``BODYSTRUCTURE``.
+
+    Returns ``(section, charset, encoding)`` for the first ``text/plain`` part
+    without a ``Content-Disposition``, or ``None`` if there is none. A
+    single-part text message is used whatever its subtype, as
+    :func:`_extract_snippet` does.
+    """
+    if isinstance(structure[0], list):
+        # Multipart: the leading lists are the children, numbered from 1.
+        for index, child in enumerate(structure, start=1):
+            if not isinstance(child, list):
                 break
-    else:
-        payload = msg.get_payload(decode=True)
-        if isinstance(payload, bytes):
-            charset = msg.get_content_charset() or "utf-8"
-            text = payload.decode(charset, errors="replace")
-        elif isinstance(payload, str):
-            text = payload
-
-    snippet = " ".join(text.strip().split())
-    return snippet[:100]
+            found = _find_text_part(child, f"{section}.{index}" if section else str(index))
+            if found is not None:
+                return found
+        return None
+
+    maintype, subtype = structure[0].upper(), structure[1].upper()
+    if maintype != b"TEXT":
+        return None
+    if section:
+        # Extension data for a text part: md5, then disposition.
+        disposition = structure[9] if len(structure) > 9 else None
+        if subtype != b"PLAIN" or disposition is not None:
+            return None
+
+    params = structure[2] or []
+    charset = "utf-8"
+    for name, value in zip(params[::2], params[1::2]):
+        if name.upper() == b"CHARSET" and value:
+            charset = value.decode("ascii", errors="replace")
+    encoding = (structure[5] or b"7BIT").decode("ascii", errors="replace").upper()
+    return section or "1", charset, encoding
+
+
+def _decode_body(data: bytes, charset: str, encoding: str) -> str:
+    """Decode a (possibly truncated) body part fetched from the server."""
+    if encoding == "BASE64":
+        data = re.sub(rb"[^A-Za-z0-9+/=]", b"", data)
+        try:
+            data = base64.b64decode(data[: len(data) // 4 * 4])
+        except binascii.Error:
+            data = b""
+    elif encoding == "QUOTED-PRINTABLE":
+        data = quopri.decodestring(data)
+    try:
+        return data.decode(charset, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def _decode_subject(msg: email.message.Message) -> str:
+    """Return the decoded ``Subject`` header of ``msg``.
+
+    Every encoded word is decoded, not just the first fragment. Unencoded
+    8-bit text is taken to be UTF-8.
+    """
+    raw = msg.get("Subject", "")
+    # Raw 8-bit header bytes come back labelled ``unknown-8bit``, which
+    # make_header cannot decode; such subjects are nearly always UTF-8.
+    fragments = [
+        (text.decode("utf-8", errors="replace"), "utf-8")
+        if charset == "unknown-8bit" and isinstance(text, bytes)
+        else (text, charset)
+        for text, charset in decode_header(raw)
+    ]
+    try:
+        return str(make_header(fragments))
+    except (LookupError, UnicodeDecodeError):
+        # Unknown or mislabelled charset: fall back to decoding only the
+        # first fragment, replacing anything undecodable.
+        subject, encoding = decode_header(raw)[0]
+        if isinstance(subject, bytes):
+            try:
+                subject = subject.decode(encoding or "utf-8", errors="replace")
+            except LookupError:
+                subject = subject.decode("utf-8", errors="replace")
+        return subject
+
+
+def _extract_snippet(msg: email.message.EmailMessage) -> str:
+    """Return a short text snippet from an email message.
+
+    ``msg`` must be parsed with ``email.policy.default`` so that
+    :meth:`~email.message.EmailMessage.get_body` can pick the plain-text part
+    without decoding any attachments.
+    """
+    body = msg.get_body(preferencelist=("plain",)) if msg.is_multipart() else msg
+    if body is None or body.get_content_maintype() != "text":
+        return ""
+
+    try:
+        text = body.get_content()
+    except LookupError:
+        # Unknown charset: decode the raw payload as UTF-8 instead.
+        text = body.get_payload(decode=True).decode("utf-8", errors="replace")
+    return _make_snippet(text)
+
+
+def _make_snippet(text: str) -> str:
+    """Collapse whitespace in ``text`` and truncate it to 100 characters."""
+    # Only look at a bounded prefix: bodies can be tens of KB but a snippet
+    # needs at most 100 characters once whitespace is collapsed.
+    return _WHITESPACE.sub(" ", text.lstrip()[:1024]).rstrip()[:100]
@@ -0,0 +1,212 @@
+"""Shared HTTP plumbing for the API clients.
+
+A pooled ``requests`` session and a lazily created ``aiohttp`` session are
+kept for the life of the process so that DNS, TCP and TLS setup are amortised
+across calls. Responses go through :mod:`.cache`: fresh entries are served
+without a request and stale ones are revalidated with a conditional GET.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import cache
+
+_TIMEOUT = 10
+
+# Longest ``Retry-After`` honoured on a ``429``, in seconds, by both the sync and
+# the async path; a server asking for more is retried sooner.
+_MAX_RETRY_AFTER = 30
+
+
+class _Retry(Retry):
+    """``Retry`` whose ``Retry-After`` wait is capped at ``_MAX_RETRY_AFTER``."""
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER)
+
+
+# Transient failures are retried with backoff. ``raise_on_status=False`` leaves
+# the final response to ``raise_for_status`` so callers still see
+# ``requests.HTTPError``.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=_Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# A ClientSession is bound to the event loop it was created in, so one is
+# created lazily per running loop. Entries go away with their loop.
+_ASYNC_SESSIONS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, aiohttp.ClientSession
+] = weakref.WeakKeyDictionary()
+
+# Concurrent async requests allowed per host, so a wide fan-out stays under the
+# provider's rate limit. ``429`` responses are retried at most _MAX_RETRIES times.
+# Like the sessions, semaphores are bound to a loop and kept per running loop.
+_MAX_CONCURRENCY = 8
+_MAX_RETRIES = 3
+_SEMAPHORES: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def cached_get(
+    url: str,
+    params: Dict[str, Any],
+    *,
+    key: Hashable,
+    ttl: float,
+    parse: Callable[[Any], Any],
+) -> Any:
+    """GET ``url`` and return ``parse(json)``, going through the disk cache.
+
+    Parameters
+    ----------
+    url, params:
+        Request URL and query parameters.
+    key:
+        Cache key for the parsed result.
+    ttl:
+        Lifetime in seconds when the response has no ``Cache-Control`` max-age.
+    parse:
+        Turns the decoded JSON body into the value that is cached and returned.
+
+    Raises
+    ------
+    requests.HTTPError
+        If the request fails, or the server answers ``304 Not Modified`` to a
+        request that was not conditional.
+    """
+    entry = cache.load(key)
+    if cache.is_fresh(entry):
+        return entry["payload"]
+
+    headers = cache.conditional_headers(entry)
+    response = _SESSION.get(url, params=params, headers=headers, timeout=_TIMEOUT)
+    if response.status_code == 304:
+        if not headers:
+            raise requests.HTTPError(
+                "304 Not Modified in reply to an unconditional request", response=response
+            )
+        return cache.refresh(key, entry, response.headers, ttl)
+    response.raise_for_status()
+    payload = parse(orjson.loads(response.content))
+    cache.store(key, payload, response.headers, ttl)
+    return payload
+
+
+async def cached_get_async(
+    url: str,
+    params: Dict[str, Any],
+    *,
+    key: Hashable,
+    ttl: float,
+    parse: Callable[[Any], Any],
+) -> Any:
+    """Asynchronous variant of :func:`cached_get`.
+
+    A failed request, like an unexpected ``304``, raises
+    ``aiohttp.ClientResponseError``.
+    """
+    entry = cache.load(key)
+    if cache.is_fresh(entry):
+        return entry["payload"]
+
+    status, headers, data = await _get_async(url, params, cache.conditional_headers(entry))
+    if status == 304:
+        return cache.refresh(key, entry, headers, ttl)
+    payload = parse(data)
+    cache.store(key, payload, headers, ttl)
+    return payload
+
+
+async def close_async_session() -> None:
+    """Close the running loop's ``aiohttp`` session, if one was opened.
+
+    Call this before the event loop finishes, e.g. at the end of the coroutine
+    passed to :func:`asyncio.run`.
+    """
+    session = _ASYNC_SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+async def _get_async(
+    url: str, params: Dict[str, Any], headers: Dict[str, str]
+) -> Tuple[int, Mapping[str, str], Any]:
+    """GET ``url`` and return ``(status, headers, data)``.
+
+    ``data`` is ``None`` for a ``304 Not Modified``, which is only accepted
+    when ``headers`` make the request conditional. A ``429`` is retried after
+    the delay given by ``Retry-After``, capped at ``_MAX_RETRY_AFTER`` seconds,
+    falling back to exponential backoff.
+    """
+    session = _get_async_session()
+    semaphore = _get_semaphore(urlsplit(url).hostname or "")
+    attempt = 0
+    while True:
+        # The slot is released before sleeping so a throttled request does not
+        # hold up others to the same host.
+        async with semaphore:
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status != 429 or attempt == _MAX_RETRIES:
+                    response.raise_for_status()
+                    if response.status != 304:
+                        data = orjson.loads(await response.read())
+                        return response.status, response.headers, data
+                    if not headers:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=304,
+                            message="Not Modified in reply to an unconditional request",
+                            headers=response.headers,
+                        )
+                    return response.status, response.headers, None
+                try:
+                    delay = float(response.headers.get("Retry-After", ""))
+                except ValueError:
+                    delay = 0.3 * 2 ** attempt
+        await asyncio.sleep(max(0.0, min(delay, _MAX_RETRY_AFTER)))
+        attempt += 1
+
+
+def _get_async_session() -> aiohttp.ClientSession:
+    """Return the running loop's ``aiohttp`` session, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    session = _ASYNC_SESSIONS.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=_TIMEOUT))
+        _ASYNC_SESSIONS[loop] = session
+    return session
+
+
+def _get_semaphore(host: str) -> asyncio.Semaphore:
+    """Return the running loop's semaphore for ``host``, creating it on first use."""
+    semaphores = _SEMAPHORES.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(_MAX_CONCURRENCY)
+    return semaphore
@@ -1,7 +1,13 @@
 import os
-from typing import Iterable, List, Dict, Optional
+from itertools import islice
+from typing import Any, Iterable, List, Dict, Optional, Tuple
 
-import requests
+from . import http_client
+
+_NEWS_API_URL = "https://newsapi.org/v2/top-headlines"
+
+# Top headlines change on the order of tens of minutes.
+_CACHE_TTL = 15 * 60
 
 
 def fetch_top_headlines(
@@ -20,7 +26,9 @@ def fetch_top_headlines(
             3 and 5.
 
     Returns:
-        A list of dictionaries each containing ``title`` and ``url``.
+        A list of dictionaries each containing ``title`` and ``url``. Results
+        are cached on disk for 15 minutes, or for the ``max-age`` advertised by
+        NewsAPI, and revalidated with a conditional GET once stale.
 
     Raises:
         EnvironmentError: If the ``NEWS_API_KEY`` environment variable is not
@@ -29,6 +37,41 @@ def fetch_top_headlines(
         requests.HTTPError: If the request to NewsAPI fails.
     """
 
+    params, limit = _build_params(keywords, category, limit)
+    return http_client.cached_get(
+        _NEWS_API_URL,
+        params,
+        key=_cache_key(params),
+        ttl=_CACHE_TTL,
+        parse=lambda data: _parse_articles(data, limit),
+    )
+
+
+async def fetch_top_headlines_async(
+    keywords: Optional[Iterable[str]] = None,
+    category: Optional[str] = None,
+    limit: int = 5,
+) -> List[Dict[str, str]]:
+    """Asynchronous variant of :func:`fetch_top_headlines`.
+
+    Takes the same arguments and returns the same result. A failed request
+    raises ``aiohttp.ClientResponseError`` instead of ``requests.HTTPError``.
+    """
+
+    params, limit = _build_params(keywords, category, limit)
+    return await http_client.cached_get_async(
+        _NEWS_API_URL,
+        params,
+        key=_cache_key(params),
+        ttl=_CACHE_TTL,
+        parse=lambda data: _parse_articles(data, limit),
+    )
+
+
+def _build_params(
+    keywords: Optional[Iterable[str]], category: Optional[str], limit: int
+) -> Tuple[Dict[str, Any], int]:
+    """Validate the arguments and return the query parameters and clamped limit."""
     api_key = os.getenv("NEWS_API_KEY")
     if not api_key:
         raise EnvironmentError("NEWS_API_KEY is not set in environment variables")
@@ -42,19 +85,24 @@ def fetch_top_headlines(
     # Clamp limit between 3 and 5
     limit = max(3, min(5, limit))
 
-    params = {"apiKey": api_key, "pageSize": limit}
+    params: Dict[str, Any] = {"apiKey": api_key, "pageSize": limit}
     if keywords:
         params["q"] = " ".join(keywords)
     elif category:
         params["category"] = category
+    return params, limit
+
+
+def _cache_key(params: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the cache key for a request; keyword order does not matter."""
+    keywords = tuple(sorted(params.get("q", "").split()))
+    return ("news", keywords, params.get("category"), params["pageSize"])
 
-    response = requests.get("https://newsapi.org/v2/top-headlines", params=params, timeout=10)
-    response.raise_for_status()
-    data = response.json()
-    articles = data.get("articles", [])
 
+def _parse_articles(data: Dict[str, Any], limit: int) -> List[Dict[str, str]]:
+    """Extract ``title``/``url`` pairs from a NewsAPI response body."""
     results = []
-    for article in articles[:limit]:
+    for article in islice(data.get("articles", ()), limit):
         title = article.get("title")
         url = article.get("url")
         if title and url:
@@ -2,14 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+import re
 import smtplib
+import threading
+from html import escape
+from email.message import Message
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Iterable, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
 
+from .email_fetcher import fetch_unread_async
+from .news_client import fetch_top_headlines_async
+from .weather_client import get_daily_weather_async
 
-def build_body(email_items: Iterable[str], weather: str, headlines: Iterable[str]) -> Tuple[str, str]:
+# Authenticated SMTP sessions keyed by ``(host, port, user)`` so repeated sends
+# skip the connect, STARTTLS and AUTH exchange.
+_POOL: Dict[Tuple[str, int, str], smtplib.SMTP] = {}
+# One lock per pool key, held for a whole send so that threads never interleave
+# commands on a shared session.
+_LOCKS: Dict[Tuple[str, int, str], threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+# Marks the parts of the cached message template that vary per send.
+_PLACEHOLDER = re.compile("__(FROM|TO|TEXT|HTML)__")
+
+
+def build_body(
+    email_items: Iterable[str],
+    weather: str,
+    headlines: Iterable[str],
+    *,
+    want_text: bool = True,
+    want_html: bool = True,
+) -> Tuple[Optional[str], Optional[str]]:
     """Construct plain text and HTML bodies for the summary email.
 
     Parameters
@@ -20,50 +48,126 @@ def build_body(email_items: Iterable[str], weather: str, headlines: Iterable[str
         A string representing current weather conditions.
     headlines:
         A list of news headlines to include.
+    want_text, want_html:
+        Whether to build the plain text and HTML versions respectively.
 
     Returns
     -------
-    tuple of str
+    tuple of str or None
         A ``(text, html)`` tuple containing the plain text and HTML versions
-        of the email body.
+        of the email body, with ``None`` for a version that was not wanted.
+        Values are HTML-escaped in the HTML version.
     """
 
-    items_list = "".join(f"- {item}\n" for item in email_items)
-    headlines_list = "".join(f"- {h}\n" for h in headlines)
+    # Both bodies iterate the inputs, so materialise them once.
+    email_items = tuple(email_items)
+    headlines = tuple(headlines)
+
+    text_body = None
+    if want_text:
+        text_parts = ["Daily Summary\n\nWeather:\n", weather, "\n\nHeadlines:\n"]
+        text_parts.extend(f"- {h}\n" for h in headlines)
+        text_parts.append("\nItems:\n")
+        text_parts.extend(f"- {item}\n" for item in email_items)
+        text_body = "".join(text_parts)
+
+    html_body = None
+    if want_html:
+        html_parts = [
+            "<html><body><h1>Daily Summary</h1><h2>Weather</h2><p>",
+            escape(weather),
+            "</p><h2>Headlines</h2><ul>",
+        ]
+        html_parts.extend(f"<li>{escape(h)}</li>" for h in headlines)
+        html_parts.append("</ul><h2>Items</h2><ul>")
+        html_parts.extend(f"<li>{escape(item)}</li>" for item in email_items)
+        html_parts.append("</ul></body></html>")
+        html_body = "".join(html_parts)
+
+    return text_body, html_body
+
+
+async def build_summary_async(
+    imap_host: str,
+    imap_user: str,
+    imap_password: str,
+    location: str,
+    *,
+    keywords: Optional[Iterable[str]] = None,
+    category: Optional[str] = None,
+    limit: int = 5,
+) -> Tuple[Optional[str], Optional[str]]:
+    """Gather unread mail, weather and headlines concurrently and build the body.
+
+    Parameters
+    ----------
+    imap_host, imap_user, imap_password:
+        IMAP server and credentials passed to
+        :func:`~.email_fetcher.fetch_unread`.
+    location:
+        Location passed to :func:`~.weather_client.get_daily_weather`.
+    keywords, category, limit:
+        Passed to :func:`~.news_client.fetch_top_headlines`.
+
+    Returns
+    -------
+    tuple of str
+        The ``(text, html)`` bodies produced by :func:`build_body`.
+
+    Notes
+    -----
+    The HTTP session is shared by every call on the running event loop and is
+    left open. The top-level caller should await
+    :func:`~.http_client.close_async_session` before the loop finishes.
+    """
 
-    text_body = (
-        "Daily Summary\n\n"
-        f"Weather:\n{weather}\n\n"
-        f"Headlines:\n{headlines_list}\n"
-        f"Items:\n{items_list}"
+    messages, weather, articles = await asyncio.gather(
+        fetch_unread_async(imap_host, imap_user, imap_password),
+        get_daily_weather_async(location),
+        fetch_top_headlines_async(keywords, category, limit),
     )
 
-    html_body = (
-        "<html><body>"
-        "<h1>Daily Summary</h1>"
-        f"<h2>Weather</h2><p>{weather}</p>"
-        "<h2>Headlines</h2><ul>"
-        + "".join(f"<li>{h}</li>" for h in headlines)
-        + "</ul>"
-        "<h2>Items</h2><ul>"
-        + "".join(f"<li>{item}</li>" for item in email_items)
-        + "</ul>"
-        "</body></html>"
+    email_items = [f"{subject}: {snippet}" if snippet else subject for subject, snippet in messages]
+    weather_text = (
+        f"{weather['condition']}, {weather['temperature']:.1f}\u00b0C, "
+        f"{weather['chance_of_rain']:.0%} chance of rain"
     )
+    headlines = [f"{article['title']} ({article['url']})" for article in articles]
 
-    return text_body, html_body
+    return build_body(email_items, weather_text, headlines)
 
 
-def send_summary_email(email_items: Iterable[str], weather: str, headlines: Iterable[str]) -> None:
+def send_summary_email(
+    email_items: Iterable[str],
+    weather: str,
+    headlines: Iterable[str],
+    *,
+    to_addrs: Optional[Iterable[str]] = None,
+    want_text: bool = True,
+    want_html: bool = True,
+) -> None:
     """Send the summary email using SMTP credentials from environment variables.
 
+    Each recipient gets its own copy of the message, so recipients do not see
+    each other, but all copies are sent over one SMTP session. The session is
+    pooled and reused by later calls; use :func:`close_all` at shutdown.
+
+    ``want_text`` and ``want_html`` select the parts to send, as for
+    :func:`build_body`. A message with a single part is sent as plain
+    ``text/plain`` or ``text/html`` rather than ``multipart/alternative``.
+
     Required environment variables:
     - ``SMTP_HOST``: SMTP server hostname.
     - ``SMTP_PORT``: SMTP server port.
     - ``SMTP_USER``: Username for authentication.
     - ``SMTP_PASSWORD``: Password for authentication.
     - ``EMAIL_FROM``: From address.
-    - ``EMAIL_TO``: Destination email address.
+    - ``EMAIL_TO``: Comma-separated destination addresses, used when
+      ``to_addrs`` is not given.
+
+    A recipient rejected by the server does not stop delivery to the others.
+    Once every copy has been attempted, :class:`smtplib.SMTPRecipientsRefused`
+    is raised with the ``{address: (code, message)}`` of each failed recipient.
     """
 
     host = os.getenv("SMTP_HOST")
@@ -71,22 +175,147 @@ def send_summary_email(email_items: Iterable[str], weather: str, headlines: Iter
     user = os.getenv("SMTP_USER")
     password = os.getenv("SMTP_PASSWORD")
     from_addr = os.getenv("EMAIL_FROM")
-    to_addr = os.getenv("EMAIL_TO")
+    if to_addrs is None:
+        to_addrs = [addr.strip() for addr in os.getenv("EMAIL_TO", "").split(",") if addr.strip()]
+    else:
+        to_addrs = list(to_addrs)
 
-    if not all([host, user, password, from_addr, to_addr]):
+    if not all([host, user, password, from_addr, to_addrs]):
         raise ValueError("Missing SMTP configuration in environment variables")
+    if not (want_text or want_html):
+        raise ValueError("At least one of want_text or want_html must be true")
+
+    text_body, html_body = build_body(
+        email_items, weather, headlines, want_text=want_text, want_html=want_html
+    )
+
+    key = (host, port, user)
+    refused: Dict[str, Tuple[int, bytes]] = {}
+    with _lock(key):
+        smtp = _get_conn(host, port, user, password)
+        for to_addr in to_addrs:
+            message = _render_message(from_addr, to_addr, text_body, html_body)
+            try:
+                try:
+                    smtp.sendmail(from_addr, [to_addr], message)
+                except smtplib.SMTPServerDisconnected:
+                    # The pooled session was dropped by the server; reconnect once.
+                    _evict(key)
+                    smtp = _get_conn(host, port, user, password)
+                    smtp.sendmail(from_addr, [to_addr], message)
+            except smtplib.SMTPRecipientsRefused as exc:
+                refused.update(exc.recipients)
+            except smtplib.SMTPDataError as exc:
+                refused[to_addr] = (exc.smtp_code, exc.smtp_error)
+    if refused:
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+
+def close_all() -> None:
+    """Quit every pooled SMTP session.
+
+    Long-running callers should invoke this at shutdown.
+    """
+    for key in list(_POOL):
+        with _lock(key):
+            _evict(key)
 
-    text_body, html_body = build_body(email_items, weather, headlines)
 
-    msg = MIMEMultipart("alternative")
+def _build_message(
+    from_addr: str, to_addr: str, text_body: Optional[str], html_body: Optional[str]
+) -> Message:
+    """Assemble the summary message with the ``email`` package."""
+    if text_body is None:
+        msg = MIMEText(html_body, "html")
+    elif html_body is None:
+        msg = MIMEText(text_body, "plain")
+    else:
+        msg = MIMEMultipart("alternative")
+        msg.attach(MIMEText(text_body, "plain"))
+        msg.attach(MIMEText(html_body, "html"))
+
     msg["Subject"] = "Daily Summary"
     msg["From"] = from_addr
     msg["To"] = to_addr
+    return msg
+
+
+@lru_cache(maxsize=None)
+def _template() -> Tuple[str, str]:
+    """Return the serialised placeholder message and its multipart boundary.
+
+    Headers and the boundary are generated once instead of on every send.
+    """
+    msg = _build_message("__FROM__", "__TO__", "__TEXT__", "__HTML__")
+    return msg.as_string(), msg.get_boundary()
+
 
-    msg.attach(MIMEText(text_body, "plain"))
-    msg.attach(MIMEText(html_body, "html"))
+def _render_message(
+    from_addr: str, to_addr: str, text_body: Optional[str], html_body: Optional[str]
+) -> str:
+    """Serialise the summary message for one recipient.
 
-    with smtplib.SMTP(host, port) as smtp:
+    ASCII-only multipart messages are substituted into :func:`_template`
+    without rebuilding the MIME tree. The result matches
+    ``_build_message(...).as_string()`` under the same boundary, except that
+    ``\\r\\n`` in a body is kept where the ``email`` package writes ``\\n``;
+    ``sendmail`` normalises line endings either way. Single-part messages and
+    anything that would need encoding go through :func:`_build_message`.
+    """
+    if text_body is None or html_body is None:
+        return _build_message(from_addr, to_addr, text_body, html_body).as_string()
+
+    template, boundary = _template()
+    values = {"FROM": from_addr, "TO": to_addr, "TEXT": text_body, "HTML": html_body}
+    if (
+        all(value.isascii() for value in values.values())
+        and not any(c in addr for addr in (from_addr, to_addr) for c in "\r\n")
+        and boundary not in text_body
+        and boundary not in html_body
+    ):
+        return _PLACEHOLDER.sub(lambda match: values[match.group(1)], template)
+    return _build_message(from_addr, to_addr, text_body, html_body).as_string()
+
+
+def _lock(key: Tuple[str, int, str]) -> threading.Lock:
+    """Return the lock guarding the pooled session for ``key``."""
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(key, threading.Lock())
+
+
+def _get_conn(host: str, port: int, user: str, password: str) -> smtplib.SMTP:
+    """Return an authenticated session, reusing the pooled one if still alive.
+
+    The caller must hold ``_lock((host, port, user))``.
+    """
+    key = (host, port, user)
+    smtp = _POOL.get(key)
+    if smtp is not None:
+        try:
+            if smtp.noop()[0] == 250:
+                return smtp
+        except (smtplib.SMTPException, OSError):
+            pass
+        _evict(key)
+
+    smtp = smtplib.SMTP(host, port)
+    try:
         smtp.starttls()
         smtp.login(user, password)
-        smtp.sendmail(from_addr, [to_addr], msg.as_string())
+    except Exception:
+        smtp.close()
+        raise
+    _POOL[key] = smtp
+    return smtp
+
+
+def _evict(key: Tuple[str, int, str]) -> None:
+    """Drop a session from the pool, quitting on a best-effort basis."""
+    smtp = _POOL.pop(key, None)
+    if smtp is None:
+        return
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
@@ -1,8 +1,15 @@
+import calendar
 import os
 from datetime import datetime
 from collections import Counter
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Iterator, List, Tuple
+
+from . import http_client
+
+_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+# OpenWeather refreshes its forecasts roughly every 30-45 minutes.
+_CACHE_TTL = 30 * 60
 
 
 def get_daily_weather(location: str) -> Dict[str, Any]:
@@ -18,43 +25,95 @@ def get_daily_weather(location: str) -> Dict[str, Any]:
     -------
     dict
         Dictionary containing today's temperature, general condition and
-        chance of rain.
+        chance of rain. Results are cached on disk for 30 minutes, or for the
+        ``max-age`` advertised by OpenWeather, and revalidated with a
+        conditional GET once stale.
+    """
+    return http_client.cached_get(
+        _FORECAST_URL,
+        _build_params(location),
+        key=_cache_key(location),
+        ttl=_CACHE_TTL,
+        parse=_summarize,
+    )
+
+
+async def get_daily_weather_async(location: str) -> Dict[str, Any]:
+    """Asynchronous variant of :func:`get_daily_weather`.
+
+    A failed request raises ``aiohttp.ClientResponseError``.
     """
+    return await http_client.cached_get_async(
+        _FORECAST_URL,
+        _build_params(location),
+        key=_cache_key(location),
+        ttl=_CACHE_TTL,
+        parse=_summarize,
+    )
+
+
+def _build_params(location: str) -> Dict[str, Any]:
+    """Return the OpenWeather query parameters for ``location``."""
     api_key = os.environ.get("OPENWEATHER_API_KEY")
     if not api_key:
         raise RuntimeError("OPENWEATHER_API_KEY environment variable not set")
 
-    params = {
+    # The forecast has one entry every 3 hours and starts at the next slot, so
+    # eight entries always cover whatever is left of today.
+    return {
         "q": location,
         "appid": api_key,
         "units": "metric",
+        "mode": "json",
+        "cnt": 8,
     }
-    response = requests.get(
-        "https://api.openweathermap.org/data/2.5/forecast",
-        params=params,
-        timeout=10,
-    )
-    response.raise_for_status()
-    data = response.json()
 
-    today = datetime.utcnow().date().isoformat()
-    todays_entries = [
-        entry for entry in data.get("list", [])
-        if entry.get("dt_txt", "").startswith(today)
-    ]
-    if not todays_entries:
-        todays_entries = data.get("list", [])[:1]
 
-    temperatures = [entry["main"]["temp"] for entry in todays_entries]
-    avg_temp = sum(temperatures) / len(temperatures)
+def _cache_key(location: str) -> Tuple[str, str, str]:
+    """Return the cache key for ``location``.
+
+    The summary covers the current UTC day, so the date is part of the key.
+    """
+    return ("weather", location, datetime.utcnow().date().isoformat())
+
 
-    conditions = [entry["weather"][0]["description"] for entry in todays_entries]
-    condition = Counter(conditions).most_common(1)[0][0]
+def _summarize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a forecast response to today's weather summary."""
+    # Compare the integer ``dt`` timestamps against today's UTC bounds rather
+    # than string-matching the formatted ``dt_txt`` of every entry.
+    day_start = calendar.timegm(datetime.utcnow().date().timetuple())
+    day_end = day_start + 86400
 
-    chance_of_rain = max((entry.get("pop", 0.0) for entry in todays_entries), default=0.0)
+    temp_sum = 0.0
+    count = 0
+    conditions: Counter = Counter()
+    chance_of_rain = 0.0
+    for entry in _todays_entries(data.get("list", []), day_start, day_end):
+        temp_sum += entry["main"]["temp"]
+        count += 1
+        conditions[entry["weather"][0]["description"]] += 1
+        pop = entry.get("pop", 0.0)
+        if pop > chance_of_rain:
+            chance_of_rain = pop
 
     return {
-        "temperature": avg_temp,
-        "condition": condition,
+        "temperature": temp_sum / count,
+        "condition": conditions.most_common(1)[0][0],
         "chance_of_rain": chance_of_rain,
     }
+
+
+def _todays_entries(
+    entries: List[Dict[str, Any]], day_start: int, day_end: int
+) -> Iterator[Dict[str, Any]]:
+    """Yield the entries timestamped within ``[day_start, day_end)``.
+
+    The first entry is yielded instead if none match.
+    """
+    found = False
+    for entry in entries:
+        if day_start <= entry.get("dt", 0) < day_end:
+            found = True
+            yield entry
+    if not found:
+        yield from entries[:1]
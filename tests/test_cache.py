@@ -0,0 +1,240 @@
+"""Tests for :mod:`src.cache` and the cached GETs in :mod:`src.http_client`."""
+
+import asyncio
+import os
+import time
+
+import aiohttp
+import orjson
+import pytest
+import requests
+from aiohttp import web
+from requests.structures import CaseInsensitiveDict
+
+from src import cache, http_client
+
+URL = "https://api.example.com/data"
+KEY = ("test", "key")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("DAILY_SUMMARY_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = b"" if body is None else orjson.dumps(body)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class FakeSession:
+    """Returns queued responses and records the headers of each request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def get(monkeypatch, *responses, ttl=60):
+    session = FakeSession(*responses)
+    monkeypatch.setattr(http_client, "_SESSION", session)
+    payload = http_client.cached_get(URL, {}, key=KEY, ttl=ttl, parse=lambda data: data["value"])
+    return payload, session
+
+
+def test_miss_fetches_and_stores(monkeypatch):
+    payload, session = get(monkeypatch, FakeResponse(body={"value": 1}))
+
+    assert payload == 1
+    assert len(session.requests) == 1
+    entry = cache.load(KEY)
+    assert entry["payload"] == 1
+    assert entry["expires"] == pytest.approx(time.time() + 60, abs=5)
+
+
+def test_fresh_hit_skips_the_request(monkeypatch):
+    get(monkeypatch, FakeResponse(body={"value": 1}))
+
+    payload, session = get(monkeypatch)
+
+    assert payload == 1
+    assert session.requests == []
+
+
+def test_max_age_overrides_default_ttl(monkeypatch):
+    get(monkeypatch, FakeResponse(headers={"Cache-Control": "public, max-age=7200"}, body={"value": 1}))
+
+    assert cache.load(KEY)["expires"] == pytest.approx(time.time() + 7200, abs=5)
+
+
+def test_no_store_is_not_cached(monkeypatch):
+    get(monkeypatch, FakeResponse(headers={"Cache-Control": "no-store"}, body={"value": 1}))
+
+    assert cache.load(KEY) is None
+
+
+def test_no_cache_is_stored_stale_for_revalidation(monkeypatch):
+    get(monkeypatch, FakeResponse(headers={"Cache-Control": "no-cache", "ETag": '"v1"'}, body={"value": 1}))
+
+    entry = cache.load(KEY)
+    assert entry["etag"] == '"v1"'
+    assert not cache.is_fresh(entry)
+
+
+def test_stale_entry_without_validator_is_not_written(monkeypatch):
+    get(monkeypatch, FakeResponse(headers={"Cache-Control": "max-age=0"}, body={"value": 1}))
+
+    assert cache.load(KEY) is None
+
+
+def test_http_error_is_raised_and_not_cached(monkeypatch):
+    with pytest.raises(requests.HTTPError):
+        get(monkeypatch, FakeResponse(status_code=500))
+
+    assert cache.load(KEY) is None
+
+
+def expire():
+    """Make the cached entry stale, keeping its validators."""
+    entry = cache.load(KEY)
+    entry["expires"] = time.time() - 1
+    with open(cache._path(KEY), "w", encoding="utf-8") as fh:
+        fh.write(orjson.dumps(entry).decode())
+
+
+def test_validators_are_sent_only_for_a_stale_entry(monkeypatch):
+    validators = {"ETag": '"v1"', "Last-Modified": "Wed, 14 Oct 2026 08:00:00 GMT"}
+    _, first = get(monkeypatch, FakeResponse(headers=validators, body={"value": 1}))
+    _, fresh = get(monkeypatch)
+    expire()
+    payload, stale = get(monkeypatch, FakeResponse(status_code=304))
+
+    assert first.requests == [{}]
+    assert fresh.requests == []
+    assert stale.requests == [
+        {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 14 Oct 2026 08:00:00 GMT"}
+    ]
+    assert payload == 1
+
+
+def test_not_modified_extends_expiry_from_new_cache_control(monkeypatch):
+    get(monkeypatch, FakeResponse(headers={"ETag": '"v1"'}, body={"value": 1}))
+    expire()
+
+    get(monkeypatch, FakeResponse(status_code=304, headers={"Cache-Control": "max-age=600"}))
+
+    entry = cache.load(KEY)
+    assert entry["expires"] == pytest.approx(time.time() + 600, abs=5)
+    assert cache.is_fresh(entry)
+
+
+def test_not_modified_keeps_validators_it_omits(monkeypatch):
+    validators = {"ETag": '"v1"', "Last-Modified": "Wed, 14 Oct 2026 08:00:00 GMT"}
+    get(monkeypatch, FakeResponse(headers=validators, body={"value": 1}))
+    expire()
+
+    refreshed = {"Last-Modified": "Thu, 15 Oct 2026 08:00:00 GMT"}
+    get(monkeypatch, FakeResponse(status_code=304, headers=refreshed))
+
+    entry = cache.load(KEY)
+    assert entry["etag"] == '"v1"'
+    assert entry["last_modified"] == "Thu, 15 Oct 2026 08:00:00 GMT"
+
+
+def test_unconditional_not_modified_raises(monkeypatch):
+    with pytest.raises(requests.HTTPError, match="unconditional"):
+        get(monkeypatch, FakeResponse(status_code=304))
+
+
+def run_async(handler):
+    """Serve ``handler`` locally and run ``cached_get_async`` against it."""
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = "http://127.0.0.1:%d/" % site._server.sockets[0].getsockname()[1]
+        try:
+            return await http_client.cached_get_async(
+                url, {}, key=KEY, ttl=60, parse=lambda data: data["value"]
+            )
+        finally:
+            await http_client.close_async_session()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_async_revalidation():
+    seen = []
+
+    async def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"Cache-Control": "max-age=600"})
+        return web.json_response({"value": 1}, headers={"ETag": '"v1"'})
+
+    assert run_async(handler) == 1
+    expire()
+    assert run_async(handler) == 1
+
+    assert seen == [None, '"v1"']
+    assert cache.load(KEY)["etag"] == '"v1"'
+    assert cache.is_fresh(cache.load(KEY))
+
+
+def test_async_unconditional_not_modified_raises():
+    async def handler(request):
+        return web.Response(status=304)
+
+    with pytest.raises(aiohttp.ClientResponseError, match="unconditional"):
+        run_async(handler)
+    assert cache.load(KEY) is None
+
+
+def test_unreadable_entry_is_a_miss(cache_dir):
+    cache.store(KEY, 1, {}, 60)
+    (path,) = cache_dir.iterdir()
+    path.write_text("{not json")
+
+    assert cache.load(KEY) is None
+
+
+def test_missing_directory_is_a_miss(monkeypatch, cache_dir):
+    monkeypatch.setenv("DAILY_SUMMARY_CACHE_DIR", str(cache_dir / "missing"))
+
+    assert cache.load(KEY) is None
+
+
+def test_write_is_atomic_and_failures_are_ignored(monkeypatch, cache_dir):
+    cache.store(KEY, 1, {}, 60)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    cache.store(KEY, 2, {}, 60)
+
+    assert cache.load(KEY)["payload"] == 1
+    assert [path.suffix for path in cache_dir.iterdir()] == [".json"]
+
+
+def test_unserialisable_payload_is_ignored(cache_dir):
+    cache.store(KEY, object(), {}, 60)
+
+    assert cache.load(KEY) is None
+    assert list(cache_dir.iterdir()) == []
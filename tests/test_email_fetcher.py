@@ -0,0 +1,207 @@
+"""Tests for the FETCH response parsing in :mod:`src.email_fetcher`.
+
+The responses below are shaped as ``imaplib.IMAP4.fetch`` returns them: each
+literal is a ``(text, literal)`` tuple and the text after it a plain bytes item.
+"""
+
+import base64
+import email
+
+from src import email_fetcher
+
+HEADER_ONLY = "(BODY.PEEK[HEADER.FIELDS (SUBJECT)] BODYSTRUCTURE)"
+
+PLAIN = b'("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 11 1 NIL NIL NIL NIL)'
+HTML = b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 20 1 NIL NIL NIL NIL)'
+PDF = b'("APPLICATION" "PDF" ("NAME" "a.pdf") NIL NIL "BASE64" 300 NIL ("ATTACHMENT" NIL) NIL NIL)'
+
+
+def literal(text, data):
+    """Return a literal item as imaplib reports it."""
+    return (text + b" {%d}" % len(data), data)
+
+
+class RecordedConnection:
+    """Replays recorded ``fetch`` results keyed by the requested items."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def fetch(self, message_set, message_parts):
+        self.calls.append((message_set, message_parts))
+        return "OK", self.responses[message_parts]
+
+
+def parse(*msg_data):
+    connection = RecordedConnection({HEADER_ONLY: list(msg_data)})
+    return email_fetcher._fetch_items(connection, [b"1", b"2"], HEADER_ONLY)
+
+
+def parse_structure(structure):
+    return parse(b"1 (BODYSTRUCTURE " + structure + b")")[b"1"]["BODYSTRUCTURE"]
+
+
+def test_literal_header():
+    responses = parse(
+        literal(b"1 (BODY[HEADER.FIELDS (SUBJECT)]", b"Subject: Hello\r\n\r\n"),
+        b" BODYSTRUCTURE " + PLAIN + b")",
+        literal(b'2 (BODYSTRUCTURE ' + HTML + b' BODY[HEADER.FIELDS ("SUBJECT")]', b"\r\n"),
+        b")",
+    )
+
+    assert responses[b"1"]["HEADER"] == b"Subject: Hello\r\n\r\n"
+    assert responses[b"1"]["BODYSTRUCTURE"][:2] == [b"TEXT", b"PLAIN"]
+    assert responses[b"2"]["HEADER"] == b"\r\n"
+    assert responses[b"2"]["BODYSTRUCTURE"][:2] == [b"TEXT", b"HTML"]
+
+
+def test_responses_for_one_message_are_merged():
+    responses = parse(
+        literal(b"1 (BODY[HEADER.FIELDS (SUBJECT)]", b"Subject: Hello\r\n\r\n"),
+        b" BODYSTRUCTURE " + PLAIN + b")",
+        b"1 (FLAGS (\\Recent))",
+    )
+
+    assert responses[b"1"]["HEADER"] == b"Subject: Hello\r\n\r\n"
+    assert responses[b"1"]["BODYSTRUCTURE"][:2] == [b"TEXT", b"PLAIN"]
+    assert responses[b"1"]["FLAGS"] == [b"\\Recent"]
+
+
+def test_failed_fetch():
+    connection = RecordedConnection({})
+    connection.fetch = lambda *args: ("NO", [None])
+    assert email_fetcher._fetch_items(connection, [b"1"], HEADER_ONLY) is None
+
+
+def test_message_sets_collapse_ranges():
+    nums = [b"%d" % n for n in (9, 1, 2, 3, 5, 7, 8, 9)]
+    assert list(email_fetcher._message_sets(nums)) == [b"1:3,5,7:9"]
+
+
+def test_message_sets_are_bounded(monkeypatch):
+    monkeypatch.setattr(email_fetcher, "_MAX_SET_BYTES", 10)
+    nums = [b"%d" % n for n in range(1, 40, 2)]
+
+    sets = list(email_fetcher._message_sets(nums))
+
+    assert all(len(message_set) <= 10 for message_set in sets)
+    assert b",".join(sets).split(b",") == nums
+
+
+def test_fetch_items_merges_batches(monkeypatch):
+    monkeypatch.setattr(email_fetcher, "_MAX_SET_BYTES", 1)
+    connection = RecordedConnection({
+        HEADER_ONLY: [b"1 (BODYSTRUCTURE NIL)", b"3 (BODYSTRUCTURE NIL)"],
+    })
+
+    responses = email_fetcher._fetch_items(connection, [b"1", b"3"], HEADER_ONLY)
+
+    assert [message_set for message_set, _ in connection.calls] == [b"1", b"3"]
+    assert responses == {b"1": {"BODYSTRUCTURE": None}, b"3": {"BODYSTRUCTURE": None}}
+
+
+def test_single_part():
+    assert email_fetcher._find_text_part(parse_structure(PLAIN)) == ("1", "utf-8", "7BIT")
+
+
+def test_single_part_html_is_used():
+    # As in _extract_snippet, a single-part text message is used whatever its
+    # subtype.
+    assert email_fetcher._find_text_part(parse_structure(HTML)) == ("1", "utf-8", "7BIT")
+
+
+def test_nested_alternative_inside_mixed():
+    structure = parse_structure(
+        b"((" + PLAIN + HTML + b' "ALTERNATIVE" ("BOUNDARY" "b2") NIL NIL)'
+        + PDF + b' "MIXED" ("BOUNDARY" "b1") NIL NIL)'
+    )
+    assert email_fetcher._find_text_part(structure) == ("1.1", "utf-8", "7BIT")
+
+
+def test_plain_attachment_is_skipped():
+    attachment = (
+        b'("TEXT" "PLAIN" NIL NIL NIL "7BIT" 5 1 NIL ("ATTACHMENT" ("FILENAME" "a.txt")) NIL NIL)'
+    )
+    structure = parse_structure(b"(" + attachment + PLAIN + b' "MIXED")')
+    assert email_fetcher._find_text_part(structure) == ("2", "utf-8", "7BIT")
+
+
+def test_no_text_part():
+    structure = parse_structure(b"(" + HTML + PDF + b' "MIXED")')
+    assert email_fetcher._find_text_part(structure) is None
+
+
+def test_literal_inside_bodystructure():
+    responses = parse(
+        literal(b"1 (BODYSTRUCTURE (" + PLAIN + b'("APPLICATION" "PDF" ("NAME"', b'a "b" (c).pdf'),
+        literal(b') NIL NIL "BASE64" 300 NIL NIL NIL NIL) "MIXED") BODY[HEADER.FIELDS (SUBJECT)]',
+                b"Subject: Report\r\n\r\n"),
+        b")",
+    )
+
+    structure = responses[b"1"]["BODYSTRUCTURE"]
+    assert structure[1][2] == [b"NAME", b'a "b" (c).pdf']
+    assert responses[b"1"]["HEADER"] == b"Subject: Report\r\n\r\n"
+    assert email_fetcher._find_text_part(structure) == ("1", "utf-8", "7BIT")
+
+
+def test_nil_structure():
+    responses = parse(b"1 (BODYSTRUCTURE NIL)")
+    assert responses[b"1"]["BODYSTRUCTURE"] is None
+
+
+def test_base64_latin1_snippet():
+    text = "Caf\xe9 cr\xe8me br\xfbl\xe9e " * 40
+    encoded = base64.encodebytes(text.encode("latin-1")).replace(b"\n", b"\r\n")
+    part = b'("TEXT" "PLAIN" ("CHARSET" "ISO-8859-1") NIL NIL "BASE64" 1000 13 NIL NIL NIL NIL)'
+    # The partial fetch ends mid-line and mid-quantum.
+    connection = RecordedConnection({
+        "(BODY.PEEK[1]<0.4096>)": [literal(b"1 (BODY[1]<0>", encoded[:203]), b")"],
+    })
+
+    snippets = email_fetcher._fetch_snippets(connection, {b"1": parse_structure(part)})
+
+    assert snippets[b"1"] == " ".join(text.split())[:100]
+
+
+def test_quoted_printable_snippet():
+    body = b"caf=C3=A9 au =\r\nlait=\r\n\r\nsecond   line"
+    part = b'("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL "QUOTED-PRINTABLE" 45 3 NIL NIL NIL NIL)'
+    structure = parse_structure(b"(" + part + HTML + b' "ALTERNATIVE")')
+    connection = RecordedConnection({
+        "(BODY.PEEK[1]<0.4096>)": [literal(b"7 (BODY[1]<0>", body), b")"],
+    })
+
+    snippets = email_fetcher._fetch_snippets(connection, {b"7": structure})
+
+    assert connection.calls == [(b"7", "(BODY.PEEK[1]<0.4096>)")]
+    assert snippets[b"7"] == "caf\xe9 au lait second line"
+
+
+def test_nil_structure_falls_back_to_full_message():
+    raw = (
+        b"Subject: Fallback\r\n"
+        b"MIME-Version: 1.0\r\n"
+        b'Content-Type: multipart/alternative; boundary="b"\r\n'
+        b"\r\n"
+        b"--b\r\n"
+        b"Content-Type: text/html\r\n\r\n<p>html</p>\r\n"
+        b"--b\r\n"
+        b"Content-Type: text/plain\r\n\r\nplain   text\r\n"
+        b"--b--\r\n"
+    )
+    connection = RecordedConnection({
+        "(BODY.PEEK[])": [literal(b"3 (BODY[]", raw), b")"],
+    })
+    structure = parse(b"3 (BODYSTRUCTURE NIL)")[b"3"]["BODYSTRUCTURE"]
+
+    snippets = email_fetcher._fetch_snippets(connection, {b"3": structure})
+
+    assert connection.calls == [(b"3", "(BODY.PEEK[])")]
+    assert snippets[b"3"] == "plain text"
+
+
+def test_raw_utf8_subject():
+    header = email.message_from_bytes(b"Subject: caf\xc3\xa9 =?utf-8?q?x?=\r\n\r\n")
+    assert email_fetcher._decode_subject(header) == "caf\xe9 =?utf-8?q?x?="
@@ -0,0 +1,130 @@
+"""Tests for :mod:`src.http_client`."""
+
+import asyncio
+
+import aiohttp
+import pytest
+import urllib3.util.retry
+
+from src import http_client
+
+HOST = "api.example.com"
+
+
+class FakeUrllib3Response:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = headers
+
+
+def test_sync_retry_after_is_capped(monkeypatch):
+    slept = []
+    monkeypatch.setattr(urllib3.util.retry.time, "sleep", slept.append)
+    retry = http_client._SESSION.get_adapter("https://example.com").max_retries
+
+    retry.sleep(FakeUrllib3Response(429, {"Retry-After": "3600"}))
+    retry.new().sleep(FakeUrllib3Response(429, {"Retry-After": "2"}))
+
+    assert slept == [http_client._MAX_RETRY_AFTER, 2]
+
+
+class FakeAiohttpResponse:
+    def __init__(self, status, headers=None, body=b"{}"):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def read(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+
+class FakeAiohttpSession:
+    """Returns queued responses, noting whether the host's slot was held."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.held = []
+
+    def get(self, url, params=None, headers=None):
+        self.held.append(http_client._get_semaphore(HOST).locked())
+        return self.responses.pop(0)
+
+
+def get_async(monkeypatch, responses):
+    """Run ``_get_async`` against ``responses`` and return its result and sleeps.
+
+    Responses are consumed from the list as they are requested.
+    """
+    session = FakeAiohttpSession(responses)
+    slept = []
+
+    async def sleep(delay):
+        assert not http_client._get_semaphore(HOST).locked()
+        slept.append(delay)
+
+    monkeypatch.setattr(http_client, "_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(http_client, "_get_async_session", lambda: session)
+    monkeypatch.setattr(http_client.asyncio, "sleep", sleep)
+    result = asyncio.run(http_client._get_async(f"https://{HOST}/data", {}, {}))
+    assert all(session.held)
+    return result, slept
+
+
+def test_async_retries_until_success(monkeypatch):
+    (status, _, data), slept = get_async(
+        monkeypatch,
+        [
+            FakeAiohttpResponse(429, {"Retry-After": "2"}),
+            FakeAiohttpResponse(200, body=b'{"value": 1}'),
+        ],
+    )
+
+    assert (status, data) == (200, {"value": 1})
+    assert slept == [2]
+
+
+def test_async_retry_limit(monkeypatch):
+    responses = [FakeAiohttpResponse(429, {"Retry-After": "1"}) for _ in range(5)]
+
+    with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+        get_async(monkeypatch, responses)
+
+    assert excinfo.value.status == 429
+    assert len(responses) == 5 - (http_client._MAX_RETRIES + 1)
+
+
+def test_async_retry_after_is_clamped(monkeypatch):
+    _, slept = get_async(
+        monkeypatch,
+        [
+            FakeAiohttpResponse(429, {"Retry-After": "3600"}),
+            FakeAiohttpResponse(429, {"Retry-After": "-5"}),
+            FakeAiohttpResponse(200),
+        ],
+    )
+
+    assert slept == [http_client._MAX_RETRY_AFTER, 0]
+
+
+def test_async_http_date_retry_after_backs_off(monkeypatch):
+    date = {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}
+    _, slept = get_async(
+        monkeypatch,
+        [
+            FakeAiohttpResponse(429, date),
+            FakeAiohttpResponse(429, date),
+            FakeAiohttpResponse(200),
+        ],
+    )
+
+    assert slept == [pytest.approx(0.3), pytest.approx(0.6)]
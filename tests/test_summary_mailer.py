@@ -0,0 +1,226 @@
+"""Tests for :mod:`src.summary_mailer`."""
+
+import asyncio
+import email
+import smtplib
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from src import http_client, summary_mailer
+
+
+def test_concurrent_summaries_share_the_http_session(monkeypatch, tmp_path):
+    monkeypatch.setenv("DAILY_SUMMARY_CACHE_DIR", str(tmp_path))
+
+    async def handler(request):
+        # The second location is slower, so it is still in flight when the
+        # first summary is finished.
+        await asyncio.sleep(float(request.query["delay"]))
+        return web.json_response({"temperature": 1.0, "condition": "clear", "chance_of_rain": 0.0})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = "http://127.0.0.1:%d/" % site._server.sockets[0].getsockname()[1]
+
+        async def fetch_unread_async(*args):
+            return []
+
+        async def get_daily_weather_async(location):
+            return await http_client.cached_get_async(
+                url, {"delay": location}, key=("test", location), ttl=0, parse=lambda data: data
+            )
+
+        async def fetch_top_headlines_async(*args):
+            return []
+
+        monkeypatch.setattr(summary_mailer, "fetch_unread_async", fetch_unread_async)
+        monkeypatch.setattr(summary_mailer, "get_daily_weather_async", get_daily_weather_async)
+        monkeypatch.setattr(summary_mailer, "fetch_top_headlines_async", fetch_top_headlines_async)
+        try:
+            return await asyncio.gather(
+                summary_mailer.build_summary_async("imap", "user", "pw", "0"),
+                summary_mailer.build_summary_async("imap", "user", "pw", "0.2"),
+            )
+        finally:
+            await http_client.close_async_session()
+            await runner.cleanup()
+
+    first, second = asyncio.run(main())
+
+    assert "clear, 1.0°C" in first[0]
+    assert "clear, 1.0°C" in second[0]
+
+
+FROM = "me@example.com"
+TO = "you@example.com"
+
+
+def render_and_build(text_body, html_body):
+    """Return ``_render_message`` output and ``_build_message`` under its boundary."""
+    rendered = summary_mailer._render_message(FROM, TO, text_body, html_body)
+    boundary = email.message_from_string(rendered).get_boundary()
+    msg = summary_mailer._build_message(FROM, TO, text_body, html_body)
+    if boundary is not None:
+        msg.set_boundary(boundary)
+    return rendered, msg.as_string(), boundary
+
+
+@pytest.mark.parametrize(
+    "text_body, html_body, uses_template",
+    [
+        ("Mail:\n- one\n- two\n", "<ul><li>one</li></ul>", True),
+        ("x" * 2000, "<p>long line</p>", True),
+        ("__FROM__ __TEXT__", "__HTML__", True),
+        ("caf\xe9", "<p>caf\xe9</p>", False),
+        ("plain only", None, False),
+        (None, "<p>html only</p>", False),
+    ],
+)
+def test_render_matches_email_package(text_body, html_body, uses_template):
+    rendered, built, boundary = render_and_build(text_body, html_body)
+
+    assert rendered == built
+    assert (boundary == summary_mailer._template()[1]) is uses_template
+
+
+def test_render_avoids_boundary_collision():
+    cached_boundary = summary_mailer._template()[1]
+
+    rendered, built, boundary = render_and_build(f"--{cached_boundary}", "<p>html</p>")
+
+    assert rendered == built
+    assert boundary != cached_boundary
+
+
+def test_render_keeps_crlf_in_bodies():
+    rendered, built, _ = render_and_build("one\r\ntwo", "<p>html</p>")
+
+    assert "one\r\ntwo" in rendered
+    assert rendered.replace("\r\n", "\n") == built
+
+
+class FakeSMTP:
+    """Records SMTP sessions; ``plan`` maps an address to the error it triggers."""
+
+    instances = []
+    plan = {}
+
+    def __init__(self, host, port):
+        self.sent = []
+        self.alive = True
+        self.busy = False
+        self.overlapped = False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("gone")
+        return 250, b"OK"
+
+    def sendmail(self, from_addr, to_addrs, message):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("gone")
+        self.overlapped |= self.busy
+        self.busy = True
+        time.sleep(0.001)
+        self.busy = False
+        error = FakeSMTP.plan.pop(to_addrs[0], None)
+        if error is not None:
+            raise error
+        self.sent.append(to_addrs[0])
+
+    def quit(self):
+        self.alive = False
+
+    def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    for name, value in {
+        "SMTP_HOST": "smtp.example.com",
+        "SMTP_USER": "user",
+        "SMTP_PASSWORD": "pw",
+        "EMAIL_FROM": FROM,
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(FakeSMTP, "instances", [])
+    monkeypatch.setattr(FakeSMTP, "plan", {})
+    yield FakeSMTP
+    summary_mailer.close_all()
+
+
+def send(*to_addrs):
+    summary_mailer.send_summary_email(["mail"], "sunny", ["news"], to_addrs=to_addrs)
+
+
+def test_session_is_pooled(smtp):
+    send("a@example.com")
+    send("b@example.com", "c@example.com")
+
+    (session,) = smtp.instances
+    assert session.sent == ["a@example.com", "b@example.com", "c@example.com"]
+
+
+def test_dead_pooled_session_is_replaced(smtp):
+    send("a@example.com")
+    smtp.instances[0].alive = False
+
+    send("b@example.com")
+
+    assert [session.sent for session in smtp.instances] == [["a@example.com"], ["b@example.com"]]
+
+
+def test_reconnects_when_disconnected_mid_send(smtp):
+    smtp.plan["b@example.com"] = smtplib.SMTPServerDisconnected("dropped")
+
+    send("a@example.com", "b@example.com", "c@example.com")
+
+    assert [session.sent for session in smtp.instances] == [
+        ["a@example.com"],
+        ["b@example.com", "c@example.com"],
+    ]
+
+
+def test_refused_recipients_do_not_stop_delivery(smtp):
+    smtp.plan["b@example.com"] = smtplib.SMTPRecipientsRefused({"b@example.com": (550, b"unknown")})
+    smtp.plan["d@example.com"] = smtplib.SMTPDataError(552, b"too big")
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused) as excinfo:
+        send("a@example.com", "b@example.com", "c@example.com", "d@example.com")
+
+    assert excinfo.value.recipients == {
+        "b@example.com": (550, b"unknown"),
+        "d@example.com": (552, b"too big"),
+    }
+    assert smtp.instances[0].sent == ["a@example.com", "c@example.com"]
+
+
+def test_threads_do_not_share_a_session_concurrently(smtp):
+    threads = [
+        threading.Thread(target=send, args=(f"{n}@example.com", f"{n}b@example.com"))
+        for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not any(session.overlapped for session in smtp.instances)
+    assert sum(len(session.sent) for session in smtp.instances) == 16